@@ -1,25 +1,44 @@
 """The CLI entry point of the Zwergenland user manager."""
 
 
-import json
-from os import environ
-from typing import Dict, List, Optional, TextIO
-from click import argument, echo, group, option, File
+from multiprocessing import freeze_support
+from os import cpu_count, environ, path
+from typing import Dict, Optional, TextIO, Tuple
+from click import argument, echo, group, option, Choice, File, Path, UsageError
 from dotenv import dotenv_values
 
 from authentication import authenticate
-from excel_reader import ExcelReader, KindergardenExcelSheetConfiguration
+from excel_reader import ExcelReader, KindergardenExcelSheetConfiguration, read_workbooks
 from group import GroupHandler
 from group_details import GroupDetails
 from invitation import InvitationHandler
+from output import NORMAL, QUIET, configure, emit_result, get_logger, is_structured
 from user import UserHandler
-from user_details import UserDetails
+from user_file import STREAM_FILE_NAMES, is_ndjson, iter_records, iter_users, write_user, write_user_dicts, write_users
+
+LOGGER = get_logger(__name__)
 
 
 @group()
-def cli():
+@option('--verbose', '-v', is_flag=True, help='Show details like the full API objects.')
+@option('--quiet', '-q', is_flag=True, help='Show only warnings and errors.')
+@option('--log-format', type=Choice(['text', 'json']), default='text',
+        help='Format of the messages on stderr and of the command results on stdout (json: one object per line).')
+def cli(verbose: bool, quiet: bool, log_format: str):
     """Main entry point of the CLI argument parser."""
-    echo("Zwergenland CLI")
+    if verbose and quiet:
+        raise UsageError("--verbose and --quiet are mutually exclusive.")
+    configure(QUIET if quiet else NORMAL + int(verbose), log_format == 'json')
+    LOGGER.info("Zwergenland CLI")
+
+
+def _confirm(prompt: str, assume_yes: bool) -> bool:
+    """Ask the user for confirmation unless it is given in advance. The prompt goes to stderr to keep stdout for results."""
+    if assume_yes:
+        LOGGER.info("%s y", prompt)
+        return True
+    echo(prompt, err=True, nl=False)
+    return input() == 'y'
 
 
 @cli.command()
@@ -29,7 +48,7 @@ def cli():
 def create_group(group_name: str, email: str | None, collaboration_group):
     """Create a new group if it is not already existing and return the UUID of the group.
        If the group is already existing, then the uuid of the existing group will be returned."""
-    print(f"Command create group {group_name}...")
+    LOGGER.info("Command create group %s...", group_name)
     env: Dict[str, str | None] = dict(environ) | dotenv_values()
     access_token = authenticate(env)
 
@@ -39,16 +58,65 @@ def create_group(group_name: str, email: str | None, collaboration_group):
 
     group_handler = GroupHandler(access_token)
     group_details = group_handler.get_or_create(group_details)
+    if group_details is not None:
+        emit_result({"name": group_name, "id": group_details['id']}, group_details['id'])
+
+
+@cli.command()
+@argument('group_names', nargs=-1)
+@option('--group-file', type=File('r'), help='JSON or NDJSON file with group details (name, email, collaborationGroup).')
+def create_groups(group_names: Tuple[str, ...], group_file: TextIO | None):
+    """Create several groups in parallel and wait until they are ready for members. Print the UUID of each group."""
+    groups = [GroupDetails(group_name, group_name, True) for group_name in group_names]
+    if group_file is not None:
+        groups.extend(GroupDetails.from_dict(group_dict) for group_dict in iter_records(group_file))
+    if not groups:
+        raise UsageError("Provide group names or a group file.")
+
+    env: Dict[str, str | None] = dict(environ) | dotenv_values()
+    access_token = authenticate(env)
+    group_handler = GroupHandler(access_token)
+    group_ids = group_handler.create_groups(groups)
+    for group_details in groups:
+        group_id = group_ids.get(group_details.name)
+        emit_result({"name": group_details.name, "id": group_id, "ready": group_id is not None},
+                    f"{group_details.name}: {group_id or 'not ready'}")
+
+
+@cli.command()
+@argument('group_prefixes', nargs=-1)
+def list_groups(group_prefixes: Tuple[str, ...]):
+    """List all groups starting with any of the given prefixes. Without prefixes GROUP_PREFIXES from the environment is used."""
+    env: Dict[str, str | None] = dict(environ) | dotenv_values()
+    prefixes = [prefix.strip() for prefix in group_prefixes]
+    if not prefixes:
+        env_prefixes = env.get('GROUP_PREFIXES')
+        if not env_prefixes:
+            raise UsageError("Provide group prefixes or set the environment value GROUP_PREFIXES.")
+        prefixes = [prefix.strip() for prefix in env_prefixes.split(',')]
+    if not all(prefixes):
+        raise UsageError("Empty group prefixes would match every group.")
+
+    access_token = authenticate(env)
+    group_handler = GroupHandler(access_token)
+    buckets = group_handler.get_groups_by_prefixes(prefixes)
+    for prefix, groups in buckets.items():
+        if not is_structured():
+            echo(f"\n{prefix}:")
+        for found_group in groups:
+            emit_result({"prefix": prefix, "id": found_group['id'], "displayName": found_group.get('displayName')},
+                        f"  {found_group['id']} {found_group.get('displayName')}")
 
 
 @cli.command()
 @argument('group_id', type=str)
 @argument('user_file', type=File('r'))
-def add_users(group_id: str, user_file: TextIO):
-    """Add a user to an existing group."""
-    echo(f"Adding users from {user_file.name} to group {group_id}")
-    data = json.load(user_file)
-    contacts = [UserDetails.from_dict(contact_dict) for contact_dict in data]
+@option('--yes', '-y', 'assume_yes', is_flag=True, help='Create missing users and add them to the group without asking.')
+def add_users(group_id: str, user_file: TextIO, assume_yes: bool):
+    """Add users to an existing group. A .ndjson file or '-' for stdin is processed line by line."""
+    if user_file.name in STREAM_FILE_NAMES and not assume_yes:
+        raise UsageError("Reading users from stdin requires --yes, because prompts cannot be answered.")
+    LOGGER.info("Adding users from %s to group %s", user_file.name, group_id)
 
     env: Dict[str, str | None] = dict(environ) | dotenv_values()
     access_token = authenticate(env)
@@ -58,38 +126,41 @@ def add_users(group_id: str, user_file: TextIO):
     existing_members = group_handler.get_group_members(group_id)
     existing_members = [item["id"] for item in existing_members]
 
-    for user_details in contacts:
-        print(user_details)
+    user_id = None
+    for user_details in iter_users(user_file):
+        LOGGER.info("%s", user_details)
         user_data = user_handler.find_by_email(user_details.email)
         if user_data:
-            print(f"  User {user_details.email} already existing.")
+            LOGGER.info("  User %s already existing.", user_details.email)
             user_id = user_data['id']
         else:
-            if input(f"  User {user_details.email} does not exist. Create? (y/N)") == 'y':
+            if _confirm(f"  User {user_details.email} does not exist. Create? (y/N)", assume_yes):
                 user_id = invitation_handler.send_invitation(user_details)
                 user_handler.update_user(user_id, user_details)
             else:
-                print("  Skipping...")
+                LOGGER.info("  Skipping...")
 
         if user_id is not None:
             if not user_id in existing_members:
-                if input(f"  We need to add user {user_id} to group {group_id}. Continue? (y/N)") == 'y':
+                if _confirm(f"  We need to add user {user_id} to group {group_id}. Continue? (y/N)", assume_yes):
                     group_handler.add_user_to_group(group_id, user_id)
 
                 else:
-                    print("  Skipping...")
+                    LOGGER.info("  Skipping...")
             else:
-                print(f"  Skipping existing group member {user_details.email}.")
+                LOGGER.info("  Skipping existing group member %s.", user_details.email)
             user_id = None
 
 
 @cli.command()
 @argument('input_file', type=File('r'))
 @option('--first-data-row', default=None, type=int, help="First row in the Excel sheet containing the data.")
-def read_users(input_file: TextIO, first_data_row: Optional[int]):
+@option('--output', '-o', 'output_file', default='users.json', type=File('w'),
+        help="Users file to write. A .ndjson file or '-' for stdout is written line by line once the sheet is loaded.")
+def read_users(input_file: TextIO, first_data_row: Optional[int], output_file: TextIO):
     """Read user details from Excel."""
     input_file.close()
-    echo(f"Reading from file {input_file.name} and the first data row {first_data_row}")
+    LOGGER.info("Reading from file %s and the first data row %s", input_file.name, first_data_row)
 
     excel_reader = ExcelReader(input_file.name)
     config = KindergardenExcelSheetConfiguration()
@@ -97,13 +168,43 @@ def read_users(input_file: TextIO, first_data_row: Optional[int]):
     if first_data_row is not None:
         config.first_data_row = first_data_row
 
-    contacts: List[UserDetails] = excel_reader.read_contacts(config)
-    print("\nContacts:")
+    if is_ndjson(output_file.name):
+        LOGGER.info("Streaming contacts to %s", output_file.name)
+        for contact in excel_reader.iter_contacts(config):
+            LOGGER.debug("%s", contact)
+            write_user(output_file, contact)
+        return
+
+    contacts = excel_reader.read_contacts(config)
     for contact in contacts:
-        print(contact)
-    print("\nWriting as users.json")
-    with open('users.json', 'w', encoding="utf-8") as file:
-        json.dump([contact.to_dict() for contact in contacts], file, indent=2)
+        LOGGER.debug("%s", contact)
+    LOGGER.info("Writing %d contact(s) as %s", len(contacts), output_file.name)
+    write_users(output_file, contacts)
+
+
+@cli.command('read-workbooks')
+@argument('input_files', nargs=-1, required=True, type=Path(exists=True, dir_okay=False))
+@option('--first-data-row', default=None, type=int, help="First row in all Excel sheets containing the data.")
+@option('--workers', default=None, type=int, help="Number of worker processes. Defaults to the number of CPUs.")
+@option('--output', '-o', 'output_file', default='users.json', type=File('w'),
+        help="Users file to write. A .ndjson file or '-' for stdout is written line by line.")
+def read_workbooks_command(input_files: Tuple[str, ...], first_data_row: Optional[int], workers: Optional[int], output_file: TextIO):
+    """Read user details from all sheets of several Excel files in parallel and merge them by email."""
+    # the same workbook given twice would be read twice and list every source twice
+    unique_files: Dict[str, str] = {}
+    for input_file in input_files:
+        unique_files.setdefault(path.normcase(path.realpath(input_file)), input_file)
+    file_names = list(unique_files.values())
+
+    LOGGER.info("Reading from %d file(s) and the first data row %s", len(file_names), first_data_row)
+    max_workers = min(workers or cpu_count() or 1, len(file_names))
+    contacts = read_workbooks(file_names, KindergardenExcelSheetConfiguration, first_data_row, max_workers)
+
+    for contact, sources in contacts:
+        LOGGER.debug("%s from %s", contact, ', '.join(str(source) for source in sources))
+    LOGGER.info("Writing %d contact(s) as %s", len(contacts), output_file.name)
+    write_user_dicts(output_file, (contact.to_dict() | {"sources": [source.to_dict() for source in sources]}
+                                   for contact, sources in contacts))
 
 
 @cli.command()
@@ -125,7 +226,9 @@ def find_user(email: str):
     access_token = authenticate(env)
 
     user_handler = UserHandler(access_token)
-    user_handler.find_by_email(email)
+    user = user_handler.find_by_email(email)
+    if user is not None:
+        emit_result(user)
 
 
 @cli.command()
@@ -138,11 +241,13 @@ def cleanup_user_data():
     all_guests = user_handler.get_guests()
     guests_without_group = user_handler.filter_users_without_group(all_guests)
     for guest in guests_without_group:
-        print(json.dumps(guest, indent=2))
-        if input("User without any groups. Delete? (y/N)") == 'y':
+        emit_result(guest)
+        if _confirm("User without any groups. Delete? (y/N)", False):
             user_id = guest['id']
             user_handler.delete_user_by_id(user_id)
 
 
 if __name__ == '__main__':
+    # worker processes of a frozen executable must not run the CLI again
+    freeze_support()
     cli()
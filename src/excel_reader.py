@@ -1,9 +1,13 @@
 """Contains class ExcelReader and default behavior constants."""
-from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Tuple, Type
 import pandas
 
+from output import configure, get_configuration, get_logger
 from user_details import UserDetails
 
+LOGGER = get_logger(__name__)
+
 # all row constants are 0 based, while Excel UI is 1 based
 
 
@@ -45,11 +49,36 @@ class KindergardenExcelSheetConfiguration:  # pylint: disable=R0903
     child_name: str | None = 'C'
 
 
+ExcelSheetConfiguration = KindergardenExcelSheetConfiguration | AssociationExcelSheetConfiguration
+
+
+class ContactSource:  # pylint: disable=R0903
+    """The origin of a contact in an Excel workbook."""
+
+    def __init__(self, file_name: str, sheet: str | int, row: int) -> None:
+        self.file_name = file_name
+        self.sheet = sheet
+        self.row = row
+
+    def __str__(self) -> str:
+        return f"{self.file_name} [{self.sheet}] row {self.row}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the source for a users file."""
+        return {"file": self.file_name, "sheet": self.sheet, "row": self.row}
+
+
 class ExcelReader:
     """The behavior necessary to open a .xlsx file and parse the contacts from the known format."""
 
     def __init__(self, file_name: str) -> None:
         self._file: pandas.ExcelFile = pandas.ExcelFile(file_name, engine='openpyxl')
+        self._sheets: Dict[str | int, pandas.DataFrame] = {}
+
+    @property
+    def sheet_names(self) -> List[str | int]:
+        """The names of all sheets in the workbook."""
+        return list(self._file.sheet_names)
 
     def _excel_col_to_index(self, col: str) -> int:
         index: int = 0
@@ -57,41 +86,79 @@ class ExcelReader:
             index = index * 26 + (ord(char.upper()) - ord('A') + 1)
         return index - 1
 
-    def _get_sheet(self, config: KindergardenExcelSheetConfiguration | AssociationExcelSheetConfiguration) -> pandas.DataFrame:  # pylint: disable=C0301
+    def _parse_sheet(self, sheet_id: str | int) -> pandas.DataFrame:
+        """Parse a sheet once and keep it for further reads."""
+        if sheet_id not in self._sheets:
+            self._sheets[sheet_id] = self._file.parse(sheet_id, header=None)
+        return self._sheets[sheet_id]
+
+    def _required_columns(self, config: ExcelSheetConfiguration) -> int:
+        """The number of columns a sheet needs to contain all configured name and email columns."""
+        columns = [config.last_name_1_column, config.first_name_1_column, config.email_1_column,
+                   config.last_name_2_column, config.first_name_2_column, config.email_2_column]
+        return max(self._excel_col_to_index(column) for column in columns) + 1
+
+    def _find_first_data_row(self, data_frame: pandas.DataFrame, config: ExcelSheetConfiguration) -> int | None:
+        """Find the row after the one where the last name column matches the known headline."""
+        column_index = self._excel_col_to_index(config.last_name_1_column)
+        # Iterate over the DataFrame to find the first row where column matches known headline.
+        for i in range(len(data_frame)):
+            value = data_frame.iat[i, column_index]
+            if value == config.last_name_1_headline:
+                return i + 1
+        return None
+
+    def check_sheet(self, config: ExcelSheetConfiguration) -> str | None:
+        """Check whether the configured sheet has the expected columns and headline.
+        The headline is only required if the first data row is not configured.
+
+        Returns:
+            str | None: The reason why the sheet can not be read or None if it can.
+        """
+        sheet_id = config.sheet_id if config.sheet_id is not None else self._file.sheet_names[0]
+        data_frame = self._parse_sheet(sheet_id)
+        required_columns = self._required_columns(config)
+        if data_frame.shape[1] < required_columns:
+            return f"{data_frame.shape[1]} column(s), but {required_columns} expected."
+        if config.first_data_row is None and self._find_first_data_row(data_frame, config) is None:
+            return f"Expected headline '{config.last_name_1_headline}' not found in column {config.last_name_1_column}."
+        return None
+
+    def _get_sheet(self, config: ExcelSheetConfiguration) -> pandas.DataFrame:
         """Validate / Complete the configuration and get the sheet."""
         if config.sheet_id is None:
             config.sheet_id = self._file.sheet_names[0]
-        data_frame = self._file.parse(config.sheet_id, header=None)
+        data_frame = self._parse_sheet(config.sheet_id)
         assert data_frame is not None, "sheet should be available here."
 
         if config.first_data_row is None:
-            column_index = self._excel_col_to_index(config.last_name_1_column)
-            # Iterate over the DataFrame to find the first row where column matches known headline.
-            for i in range(len(data_frame)):
-                value = data_frame.iat[i, column_index]
-                if value == config.last_name_1_headline:
-                    print(f"First row where column {column_index+1} matches expected headline is: {i+1}")
-                    config.first_data_row = i + 1
-                    break
+            config.first_data_row = self._find_first_data_row(data_frame, config)
+            if config.first_data_row is not None:
+                LOGGER.info("First row where column %s matches expected headline is: %d", config.last_name_1_column, config.first_data_row)
 
         assert config.first_data_row is not None, "Expected headline not found in sheet."
 
         return data_frame
 
-    def _check_and_add_user_details(self, first_name, lastname, email, contacts: List[UserDetails], index: int):
-        """Check the input values whether they are feasible to create a user detail to import as a mail contact. Add user if feasible. Else log."""
+    def _check_user_details(self, first_name, lastname, email, index: int) -> UserDetails | None:
+        """Check the input values whether they are feasible to create a user detail to import as a mail contact. Return it if feasible. Else log."""
         if not pandas.isna(email):
-            print(f"{email} ")
-            contacts.append(UserDetails(str(first_name), str(lastname), str(email)))
-            return
+            LOGGER.debug("%s", email)
+            return UserDetails(str(first_name), str(lastname), str(email))
 
-        print(f"User details in line {index} skipped.")
+        LOGGER.debug("User details in line %d skipped.", index)
         return None
 
-    def read_contacts(self, config: KindergardenExcelSheetConfiguration | AssociationExcelSheetConfiguration) -> List[UserDetails]:  # pylint: disable=C0301
-        """Read the Excel file in the child-parent-format and parse parent contacts."""
-        print("\nhello\n")
+    def iter_contacts(self, config: ExcelSheetConfiguration) -> Iterator[UserDetails]:
+        """Read the Excel file in the child-parent-format and yield parent contacts row by row.
 
+        The sheet is loaded as a whole first, only the contacts are handed out one by one.
+        """
+        for _, user_details in self.iter_contact_rows(config):
+            yield user_details
+
+    def iter_contact_rows(self, config: ExcelSheetConfiguration) -> Iterator[Tuple[int, UserDetails]]:
+        """Read the Excel file in the child-parent-format and yield parent contacts with their 1 based Excel row."""
         sheet = self._get_sheet(config)
         assert isinstance(config.first_data_row, int), "First data row is expected to be set here."
         last_name_1_column_index = self._excel_col_to_index(config.last_name_1_column)
@@ -101,7 +168,6 @@ class ExcelReader:
         first_name_2_column_index = self._excel_col_to_index(config.first_name_2_column)
         email_2_column_index = self._excel_col_to_index(config.email_2_column)
 
-        contacts: List[UserDetails] = []
         for index in range(config.first_data_row, len(sheet)):
             last_name_1 = sheet.iloc[index, last_name_1_column_index]
             first_name_1 = sheet.iloc[index, first_name_1_column_index]
@@ -111,10 +177,57 @@ class ExcelReader:
             email_2 = sheet.iloc[index, email_2_column_index]
 
             if pandas.isna(email_1) and pandas.isna(email_2):
-                print(f"Stopping iteration at index {index} where email Column {email_1_column_index} and {email_2_column_index} are empty.")
+                LOGGER.info("Stopping iteration at index %d where email Column %d and %d are empty.",
+                            index, email_1_column_index, email_2_column_index)
                 break
 
-            self._check_and_add_user_details(first_name_1, last_name_1, email_1, contacts, index)
-            self._check_and_add_user_details(first_name_2, last_name_2, email_2, contacts, index)
+            for user_details in (self._check_user_details(first_name_1, last_name_1, email_1, index),
+                                 self._check_user_details(first_name_2, last_name_2, email_2, index)):
+                if user_details is not None:
+                    yield index + 1, user_details
 
-        return contacts
+    def read_contacts(self, config: ExcelSheetConfiguration) -> List[UserDetails]:
+        """Read the Excel file in the child-parent-format and parse parent contacts."""
+        return list(self.iter_contacts(config))
+
+
+def read_workbook(file_name: str, config_type: Type[ExcelSheetConfiguration],
+                  first_data_row: int | None = None) -> List[Tuple[UserDetails, ContactSource]]:
+    """Read the contacts of all sheets of a workbook. Sheets failing ExcelReader.check_sheet are skipped.
+
+    This is the worker of read_workbooks, so it only takes and returns picklable values.
+    """
+    excel_reader = ExcelReader(file_name)
+    contacts: List[Tuple[UserDetails, ContactSource]] = []
+    for sheet_name in excel_reader.sheet_names:
+        config = config_type()
+        config.sheet_id = sheet_name
+        config.first_data_row = first_data_row
+        problem = excel_reader.check_sheet(config)
+        if problem is not None:
+            LOGGER.warning("Sheet %s of %s skipped: %s", sheet_name, file_name, problem)
+            continue
+        contacts.extend((user_details, ContactSource(file_name, sheet_name, row))
+                        for row, user_details in excel_reader.iter_contact_rows(config))
+    return contacts
+
+
+def read_workbooks(file_names: List[str], config_type: Type[ExcelSheetConfiguration], first_data_row: int | None = None,
+                   max_workers: int | None = None) -> List[Tuple[UserDetails, List[ContactSource]]]:
+    """Read all sheets of several workbooks with one worker process per file.
+
+    Contacts are deduplicated by their case insensitive email. The first occurrence in the given file order
+    wins and every occurrence is kept as source.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=configure, initargs=get_configuration()) as executor:
+        results = list(executor.map(read_workbook, file_names, [config_type] * len(file_names), [first_data_row] * len(file_names)))
+
+    merged: Dict[str, Tuple[UserDetails, List[ContactSource]]] = {}
+    for contacts in results:
+        for user_details, source in contacts:
+            key = user_details.email.strip().lower()
+            if key in merged:
+                merged[key][1].append(source)
+            else:
+                merged[key] = (user_details, [source])
+    return list(merged.values())
@@ -1,15 +1,27 @@
 """Handle groups API requests."""
 
 
-import json
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
 import sys
+import time
 from typing import Any, Dict, List
 import requests
 
 from group_details import GroupDetails
+from output import get_logger, log_data
 
 
 GROUPS_URL = "https://graph.microsoft.com/v1.0/groups"
+# Microsoft Graph rejects directory filters with too many OR-ed clauses
+MAX_FILTER_CLAUSES = 15
+MAX_PARALLEL_REQUESTS = 4
+# new groups take a while until they are replicated and accept members
+READINESS_INITIAL_DELAY = 2.0
+READINESS_MAX_DELAY = 30.0
+READINESS_TIMEOUT = 600.0
+
+LOGGER = get_logger(__name__)
 
 
 class GroupHandler:   # [too-few-public-methods]
@@ -26,17 +38,19 @@ class GroupHandler:   # [too-few-public-methods]
         response = requests.get(GROUPS_URL, headers=self._headers, timeout=30)
         groups = response.json()
         assert isinstance(groups, dict)
-        print(json.dumps(groups, indent=2))
+        log_data(LOGGER, logging.DEBUG, "All groups", groups)
         return groups.get("value", None)
 
     def create_group(self, group_details: GroupDetails) -> Dict | None:
         """Create a Microsoft 365 Group."""
         response = requests.post(GROUPS_URL, headers=self._headers, json=group_details.get_group_dict(), timeout=30)
-        assert response.status_code == 201
-        print("--- creating group ---")
-        print(json.dumps(response.json(), indent=2))
-        print("---")
-        return response.json()
+        if response.status_code != 201:
+            log_data(LOGGER, logging.ERROR, f"Error: {response.status_code} while creating group {group_details.name}", response.json())
+            return None
+        group = response.json()
+        LOGGER.info("Group %s created.", group_details.name)
+        log_data(LOGGER, logging.DEBUG, "Created group", group)
+        return group
 
     def get_groups(self, group_prefix: str) -> List:
         """Get a Microsoft 365 groups by the starting letters of the Name."""
@@ -46,34 +60,189 @@ class GroupHandler:   # [too-few-public-methods]
 
         response = requests.get(GROUPS_URL, headers=self._headers, params=params, timeout=30)
 
-        # Check the response status and print the results
+        # Check the response status and log the results
         if response.status_code == 200:
             groups: List = response.json().get('value', [])
             if len(groups):
-                print(f"--- {len(groups)} group(s) found. ---")
-                print(json.dumps(groups, indent=2))
-                print("---")
+                LOGGER.info("%d group(s) found.", len(groups))
+                log_data(LOGGER, logging.DEBUG, "Found groups", groups)
             else:
-                print(f"No groups found starting with '{group_prefix}'.")
+                LOGGER.info("No groups found starting with '%s'.", group_prefix)
             return groups
         else:
-            print(f"Error: {response.status_code}")
-            print(response.json())
+            log_data(LOGGER, logging.ERROR, f"Error: {response.status_code}", response.json())
             sys.exit(1)
         return None
 
+    def get_groups_by_prefixes(self, group_prefixes: List[str]) -> Dict[str, List]:
+        """Get Microsoft 365 groups for several name prefixes at once.
+
+        The prefixes are combined into OR-ed startswith filters, chunked to the Graph filter limits and requested in parallel.
+
+        Args:
+            group_prefixes (List[str]): The starting letters of the group names.
+
+        Returns:
+            Dict[str, List]: The found groups bucketed by prefix. A group matching several prefixes is in each of their buckets.
+        """
+        assert all(group_prefixes), "Empty group prefixes would match every group."
+        prefixes = list(dict.fromkeys(group_prefixes))
+        chunks = [prefixes[i:i + MAX_FILTER_CLAUSES] for i in range(0, len(prefixes), MAX_FILTER_CLAUSES)]
+
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL_REQUESTS) as executor:
+            results = list(executor.map(self._get_groups_by_filter, chunks))
+
+        # overlapping prefixes in different chunks find the same group more than once
+        unique_groups: Dict[str, Any] = {}
+        for groups in results:
+            for group in groups:
+                unique_groups.setdefault(group['id'], group)
+
+        buckets: Dict[str, List] = {prefix: [] for prefix in prefixes}
+        for group in unique_groups.values():
+            display_name = (group.get('displayName') or '').lower()
+            for prefix in prefixes:
+                if display_name.startswith(prefix.lower()):
+                    buckets[prefix].append(group)
+
+        for prefix, groups in buckets.items():
+            LOGGER.info("%d group(s) found starting with '%s'.", len(groups), prefix)
+        return buckets
+
+    def _get_groups_by_filter(self, group_prefixes: List[str]) -> List:
+        """Get all groups starting with any of the given prefixes following the result pages."""
+        # single quotes are escaped by doubling them in OData string literals
+        escaped_prefixes = [prefix.replace("'", "''") for prefix in group_prefixes]
+        clauses = [f"startswith(displayName, '{prefix}')" for prefix in escaped_prefixes]
+        params: Dict[str, str] | None = {
+            "$filter": " or ".join(clauses)
+        }
+
+        groups: List = []
+        url: str | None = GROUPS_URL
+        while url:
+            response = requests.get(url, headers=self._headers, params=params, timeout=30)
+            if response.status_code != 200:
+                log_data(LOGGER, logging.ERROR, f"Error: {response.status_code}", response.json())
+                sys.exit(1)
+
+            result = response.json()
+            groups.extend(result.get('value', []))
+            url = result.get('@odata.nextLink', None)
+            # the next link already contains all query parameters
+            params = None
+
+        return groups
+
     def get_or_create(self, group: GroupDetails) -> Dict | None:
-        """Try to find an existing group with the specified name.
-        If it is not found, then it will be created with the given details."""
-        found_groups = self.get_groups(group.name)
+        """Try to find an existing group with exactly the specified name.
+        If it is not found, then it will be created with the given details.
+        None if the lookup or the creation failed."""
+        # single quotes are escaped by doubling them in OData string literals
+        escaped_name = group.name.replace("'", "''")
+        params = {
+            "$filter": f"displayName eq '{escaped_name}'"
+        }
+        response = requests.get(GROUPS_URL, headers=self._headers, params=params, timeout=30)
+        if response.status_code != 200:
+            log_data(LOGGER, logging.ERROR, f"Error: {response.status_code} while searching group {group.name}", response.json())
+            return None
 
+        found_groups = response.json().get('value', [])
         if found_groups:
             if len(found_groups) > 1:
-                print(f"Taking first found group {found_groups[0]['id']}.")
+                LOGGER.warning("Taking first found group %s.", found_groups[0]['id'])
             return found_groups[0]
 
         return self.create_group(group)
 
+    def create_groups(self, groups: List[GroupDetails]) -> Dict[str, str]:
+        """Get or create several groups in parallel and wait until all of them are ready for member additions.
+
+        Args:
+            groups (List[GroupDetails]): The details of the groups to provision.
+
+        Returns:
+            Dict[str, str]: The group UUID by group name for all groups which are ready.
+                Groups failing or not ready within the timeout are reported and left out.
+        """
+        # the same name twice in one batch would otherwise be created twice in parallel
+        unique_groups: Dict[str, GroupDetails] = {}
+        for group_details in groups:
+            unique_groups.setdefault(group_details.name, group_details)
+        groups = list(unique_groups.values())
+
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL_REQUESTS) as executor:
+            futures: Dict[str, Future] = {group_details.name: executor.submit(self.get_or_create, group_details)
+                                          for group_details in groups}
+
+        # one failing group must not abort the batch, so every result is collected on its own
+        pending: Dict[str, str] = {}
+        for name, future in futures.items():
+            try:
+                group = future.result()
+            except requests.RequestException as error:
+                LOGGER.error("Group %s could not be created: %s", name, error)
+                continue
+            if group is None:
+                LOGGER.error("Group %s could not be created.", name)
+            else:
+                pending[name] = group['id']
+
+        return self._wait_until_ready(pending)
+
+    def _wait_until_ready(self, pending: Dict[str, str]) -> Dict[str, str]:
+        """Poll all pending groups in one shared loop with exponential backoff until their members can be read.
+        Groups which can never become ready are dropped, those still pending at the timeout are reported."""
+        pending = dict(pending)
+        ready: Dict[str, str] = {}
+        delay = READINESS_INITIAL_DELAY
+        deadline = time.monotonic() + READINESS_TIMEOUT
+
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL_REQUESTS) as executor:
+            while pending:
+                names = list(pending)
+                states = executor.map(self._is_ready, [pending[name] for name in names])
+                for name, is_ready in zip(names, states):
+                    if is_ready:
+                        LOGGER.info("Group %s is ready.", name)
+                        ready[name] = pending.pop(name)
+                    elif is_ready is None:
+                        LOGGER.error("Group %s (%s) will not become ready.", name, pending.pop(name))
+
+                if not pending or time.monotonic() + delay > deadline:
+                    break
+                LOGGER.info("Waiting %.0f seconds for %d group(s) to become ready.", delay, len(pending))
+                time.sleep(delay)
+                delay = min(delay * 2, READINESS_MAX_DELAY)
+
+        for name, group_id in pending.items():
+            LOGGER.warning("Group %s (%s) is not ready after %.0f seconds.", name, group_id, READINESS_TIMEOUT)
+        return ready
+
+    def _is_ready(self, group_id: str) -> bool | None:
+        """Check whether the group is replicated far enough to accept member additions.
+
+        Returns:
+            bool | None: True if ready, False if it is worth to poll again and None if it will never become ready.
+        """
+        url = f"{GROUPS_URL}/{group_id}/members"
+        try:
+            response = requests.get(url, headers=self._headers, params={"$top": "1"}, timeout=30)
+        except requests.RequestException as error:
+            LOGGER.warning("Checking group %s failed: %s", group_id, error)
+            return False
+
+        if response.status_code == 200:
+            return True
+        # missing permissions do not go away by waiting
+        if response.status_code in (401, 403):
+            log_data(LOGGER, logging.ERROR, f"Error: {response.status_code} while checking group {group_id}", response.json())
+            return None
+        # 404 until the new group is replicated, other codes like 429 or 5xx are transient
+        LOGGER.debug("Group %s not ready yet: %s", group_id, response.status_code)
+        return False
+
     def add_user_to_group(self, group_id: str, user_id: str) -> bool:
         """Generic add a user to a group.
 
@@ -92,11 +261,10 @@ class GroupHandler:   # [too-few-public-methods]
         response = requests.post(url, headers=self._headers, json=data, timeout=30)
 
         if response.status_code == 204:
-            print(f"User {user_id} added to group {group_id} successfully.")
+            LOGGER.info("User %s added to group %s successfully.", user_id, group_id)
             return True
 
-        print(f"Error: {response.status_code} User {user_id} and group {group_id}")
-        print(response.json())
+        log_data(LOGGER, logging.ERROR, f"Error: {response.status_code} User {user_id} and group {group_id}", response.json())
         return False
 
     def get_group_members(self, group_id: str) -> List[Dict[str, Any]]:
@@ -106,13 +274,9 @@ class GroupHandler:   # [too-few-public-methods]
 
         if response.status_code == 200:  # 200 OK means success
             members = response.json().get('value', [])
-            print(f"--- Members of group {group_id} ---")
-            for member in members:
-                print(json.dumps(member, indent=2))
-                print("---")
-            print("--- ---")
+            LOGGER.info("%d member(s) in group %s.", len(members), group_id)
+            log_data(LOGGER, logging.DEBUG, f"Members of group {group_id}", members)
             return members
 
-        print(f"Error: {response.status_code}")
-        print(response.json())
+        log_data(LOGGER, logging.ERROR, f"Error: {response.status_code}", response.json())
         sys.exit(1)
@@ -11,6 +11,11 @@ class GroupDetails:
         self._email = email
         self._collaboration_group = collaboration_group
 
+    @classmethod
+    def from_dict(cls, dict_obj: Dict[str, Any]) -> 'GroupDetails':
+        """Create the details from a groups file entry. The email defaults to the name."""
+        return cls(dict_obj["name"], dict_obj.get("email") or dict_obj["name"], dict_obj.get("collaborationGroup", True))
+
     def get_group_dict(self) -> Dict[str, Any]:
         """Generate a dictionary to serialize for Microsoft 365 API."""
 
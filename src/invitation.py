@@ -1,12 +1,16 @@
 """Handle invitations API requests."""
 
+import logging
 import sys
 import requests
 
+from output import get_logger, log_data
 from user_details import UserDetails
 
 INVITATIONS_URL = "https://graph.microsoft.com/v1.0/invitations"
 
+LOGGER = get_logger(__name__)
+
 
 class InvitationHandler:  # [too-few-public-methods]
     """Handle invitations API requests."""
@@ -26,9 +30,8 @@ class InvitationHandler:  # [too-few-public-methods]
         if response.status_code == 201:
             invitation_response = response.json()
             invited_user_id = invitation_response["invitedUser"]["id"]
-            print(f"Einladung an {user_details.email} erfolgreich gesendet. Benutzer-ID: {invited_user_id}")
+            LOGGER.info("Einladung an %s erfolgreich gesendet. Benutzer-ID: %s", user_details.email, invited_user_id)
             return invited_user_id
 
-        print(f"Fehler beim Senden der Einladung: {response.status_code}")
-        print(response.json())
+        log_data(LOGGER, logging.ERROR, f"Fehler beim Senden der Einladung: {response.status_code}", response.json())
         sys.exit(1)
@@ -0,0 +1,107 @@
+"""Central output of diagnostic messages with verbosity levels and optional structured JSON lines.
+
+Messages are written to stderr, so stdout stays free for command results and piped data.
+Attached data is only serialized when the message passes the configured level.
+Command results are written to stdout as text or, in structured mode, as one JSON object per line.
+"""
+
+import json
+import logging
+import sys
+from typing import Any, Dict
+
+LOGGER_NAME = "zwergenland"
+
+QUIET = -1
+NORMAL = 0
+VERBOSE = 1
+
+_configuration = (NORMAL, False)
+
+_LEVELS = {
+    QUIET: logging.WARNING,
+    NORMAL: logging.INFO,
+    VERBOSE: logging.DEBUG
+}
+
+
+class TextFormatter(logging.Formatter):
+    """Human readable output. Attached data is pretty printed below the message."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        if hasattr(record, "data"):
+            message = f"{message}\n{json.dumps(getattr(record, 'data'), indent=2, default=str)}"
+        if record.exc_info:
+            message = f"{message}\n{self.formatException(record.exc_info)}"
+        if record.stack_info:
+            message = f"{message}\n{self.formatStack(record.stack_info)}"
+        return message
+
+
+class JsonFormatter(logging.Formatter):
+    """Machine readable output with one JSON object per message."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        if hasattr(record, "data"):
+            entry["data"] = getattr(record, "data")
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Get the logger of a module below the application logger. Configures the default output if not done yet."""
+    if not logging.getLogger(LOGGER_NAME).handlers:
+        configure()
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def configure(verbosity: int = NORMAL, structured: bool = False) -> None:
+    """Set the verbosity level and the output format of all application loggers."""
+    global _configuration  # pylint: disable=W0603
+    _configuration = (verbosity, structured)
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if structured else TextFormatter())
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.handlers = [handler]
+    logger.setLevel(_LEVELS[max(QUIET, min(VERBOSE, verbosity))])
+    logger.propagate = False
+
+
+def get_configuration() -> tuple[int, bool]:
+    """Get the verbosity and format arguments of the last configuration, e.g. to configure worker processes alike."""
+    return _configuration
+
+
+def is_structured() -> bool:
+    """Whether machine readable JSON output is configured."""
+    return _configuration[1]
+
+
+def emit_result(record: Dict[str, Any], text: str | None = None) -> None:
+    """Write a command result to stdout. In structured mode the record is one JSON line, else the text is written.
+
+    Args:
+        record (Dict[str, Any]): The machine readable result.
+        text (str | None): The human readable result. Defaults to the record as indented JSON.
+    """
+    if is_structured():
+        sys.stdout.write(json.dumps(record, default=str) + "\n")
+    else:
+        sys.stdout.write((text if text is not None else json.dumps(record, indent=2, default=str)) + "\n")
+    sys.stdout.flush()
+
+
+def log_data(logger: logging.Logger, level: int, message: str, data: Any) -> None:
+    """Log a message with attached data. The data is serialized by the formatter only if the level is enabled."""
+    if logger.isEnabledFor(level):
+        logger.log(level, message, extra={"data": data})
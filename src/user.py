@@ -1,14 +1,17 @@
 """Handle users API requests."""
 
-import json
+import logging
 import sys
 from typing import Any, Dict, List
 from urllib.parse import parse_qs, urlparse
 import requests
+from output import get_logger, log_data
 from user_details import UserDetails
 
 USERS_URL = "https://graph.microsoft.com/v1.0/users"
 
+LOGGER = get_logger(__name__)
+
 
 class UserHandler:
     """Handle users API requests."""
@@ -40,11 +43,10 @@ class UserHandler:
         response = requests.patch(update_user_url, json=update_data, headers=self._headers, timeout=30)
 
         if response.status_code == 204:
-            print(f"Benutzerinformationen für {update_data['mail']} wurden erfolgreich aktualisiert.")
+            LOGGER.info("Benutzerinformationen für %s wurden erfolgreich aktualisiert.", update_data['mail'])
             return self.get_by_id(user_id)
 
-        print(f"Fehler beim Aktualisieren der Benutzerinformationen: {response.status_code}")
-        print(json.dumps(response.json(), indent=2))
+        log_data(LOGGER, logging.ERROR, f"Fehler beim Aktualisieren der Benutzerinformationen: {response.status_code}", response.json())
         sys.exit(1)
 
     def get_guests(self) -> List:
@@ -70,11 +72,10 @@ class UserHandler:
                 guests.extend(result.get('value', []))
                 url = result.get('@odata.nextLink', None)  # Fetch the next page URL
             else:
-                print(f"Fehler beim Abrufen der Gastbenutzer: {response.status_code}")
-                print(response.json())
+                log_data(LOGGER, logging.ERROR, f"Fehler beim Abrufen der Gastbenutzer: {response.status_code}", response.json())
                 sys.exit(1)
 
-        print(f"\n\nEs wurden {len(guests)} Gastbenutzer gefunden.\n")
+        LOGGER.info("Es wurden %d Gastbenutzer gefunden.", len(guests))
         return guests
 
     def find_by_email(self, email: str) -> Dict[str, Any] | None:
@@ -97,16 +98,13 @@ class UserHandler:
         if response.status_code == 200:
             users = response.json().get('value', None)
             if users:
-                print("-- user found ---")
-                for user in users:
-                    print(json.dumps(user, indent=2))
-                    print("---")
-                    return user
-            else:
-                print("No user found with that email address.")
+                user = users[0]
+                LOGGER.info("User %s found.", user.get('mail'))
+                log_data(LOGGER, logging.DEBUG, "Found user", user)
+                return user
+            LOGGER.info("No user found with that email address.")
         else:
-            print(f"Error: {response.status_code}")
-            print(json.dumps(response.json(), indent=2))
+            log_data(LOGGER, logging.ERROR, f"Error: {response.status_code}", response.json())
             sys.exit(1)
         return None
 
@@ -117,13 +115,11 @@ class UserHandler:
 
         if response.status_code == 200:
             user = response.json()
-            print("-- user found ---")
-            print(json.dumps(user, indent=2))
-            print("---")
+            LOGGER.info("User %s found.", user_id)
+            log_data(LOGGER, logging.DEBUG, "Found user", user)
             return user
 
-        print(f"Error Code {response.status_code} while trying to find user id '{user_id}'.")
-        print(json.dumps(response.json(), indent=2))
+        log_data(LOGGER, logging.ERROR, f"Error Code {response.status_code} while trying to find user id '{user_id}'.", response.json())
         return None
 
     def filter_users_without_group(self, users: List) -> List:
@@ -140,10 +136,11 @@ class UserHandler:
                 if not groups:  # No group membership
                     users_without_group.append(user)
             else:
-                print(f"Fehler beim Abrufen der Gruppenmitgliedschaften für {user['userPrincipalName']}: {group_response.status_code}")
-                print(group_response.json())
+                log_data(LOGGER, logging.ERROR,
+                         f"Fehler beim Abrufen der Gruppenmitgliedschaften für {user['userPrincipalName']}: {group_response.status_code}",
+                         group_response.json())
 
-        print(f"\n\nEs wurden {len(users_without_group)} Nutzer ohne Gruppe gefunden.\n")
+        LOGGER.info("Es wurden %d Nutzer ohne Gruppe gefunden.", len(users_without_group))
         return users_without_group
 
     def delete_user_by_id(self, user_id) -> bool:
@@ -153,9 +150,8 @@ class UserHandler:
         response = requests.delete(delete_url, headers=self._headers, timeout=30)
 
         if response.status_code == 204:
-            print(f"User with ID {user_id} has been deleted.")
+            LOGGER.info("User with ID %s has been deleted.", user_id)
             return True
 
-        print(f"Issue deleting user with ID {user_id}: Status {response.status_code}")
-        print(response.json())
+        log_data(LOGGER, logging.ERROR, f"Issue deleting user with ID {user_id}: Status {response.status_code}", response.json())
         return False
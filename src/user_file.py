@@ -0,0 +1,57 @@
+"""Read and write user details and other record files as JSON array or newline delimited JSON (NDJSON)."""
+
+import json
+from typing import Any, Dict, Iterable, Iterator, TextIO
+
+from user_details import UserDetails
+
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl')
+STREAM_FILE_NAMES = ('-', '<stdin>', '<stdout>')
+
+
+def is_ndjson(file_name: str) -> bool:
+    """Decide by the file name whether the NDJSON format shall be used. Standard streams are always NDJSON."""
+    return file_name in STREAM_FILE_NAMES or file_name.lower().endswith(NDJSON_EXTENSIONS)
+
+
+def iter_records(file: TextIO) -> Iterator[Dict[str, Any]]:
+    """Iterate the JSON objects of a file in the format selected by the file name.
+
+    NDJSON files are consumed line by line, so the first record is available before the file is complete.
+    JSON array files are loaded as a whole.
+    """
+    if not is_ndjson(file.name):
+        yield from json.load(file)
+        return
+
+    for line in file:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def iter_users(file: TextIO) -> Iterator[UserDetails]:
+    """Iterate the user details of a users file."""
+    for contact_dict in iter_records(file):
+        yield UserDetails.from_dict(contact_dict)
+
+
+def write_user(file: TextIO, user_details: UserDetails) -> None:
+    """Write a single user details line to a NDJSON file and flush it for the consumer."""
+    file.write(json.dumps(user_details.to_dict()) + "\n")
+    file.flush()
+
+
+def write_users(file: TextIO, contacts: Iterable[UserDetails]) -> None:
+    """Write user details in the format selected by the file name."""
+    write_user_dicts(file, (contact.to_dict() for contact in contacts))
+
+
+def write_user_dicts(file: TextIO, user_dicts: Iterable[Dict[str, Any]]) -> None:
+    """Write serialized user details, possibly with additional keys, in the format selected by the file name."""
+    if is_ndjson(file.name):
+        for user_dict in user_dicts:
+            file.write(json.dumps(user_dict) + "\n")
+            file.flush()
+    else:
+        json.dump(list(user_dicts), file, indent=2)
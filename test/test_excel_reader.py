@@ -0,0 +1,71 @@
+"""This class tests reading contacts from several workbooks and sheets."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import openpyxl
+
+from excel_reader import KindergardenExcelSheetConfiguration, read_workbook, read_workbooks
+
+
+MAPPE1 = os.path.join(os.path.dirname(__file__), os.pardir, "test-res", "Mappe1.xlsx")
+
+
+def _summary(contacts):
+    """Email, sheet and row of each read contact."""
+    return [(user_details.email, source.sheet, source.row) for user_details, source in contacts]
+
+
+class TestReadWorkbooks(unittest.TestCase):
+    """Parallel ingestion of workbooks into one deduplicated contact set."""
+
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        self.copy = os.path.join(self._directory, "Kopie.xlsx")
+        shutil.copyfile(MAPPE1, self.copy)
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def test_merge_with_sources(self):
+        """The same contacts in two workbooks are merged and keep both sources."""
+        single = read_workbook(MAPPE1, KindergardenExcelSheetConfiguration)
+        self.assertTrue(single)
+
+        contacts = read_workbooks([MAPPE1, self.copy], KindergardenExcelSheetConfiguration, max_workers=2)
+
+        self.assertEqual(len(contacts), len({user_details.email.lower() for user_details, _ in single}))
+        for _, sources in contacts:
+            self.assertEqual({source.file_name for source in sources}, {MAPPE1, self.copy})
+            self.assertTrue(all(source.row > 0 for source in sources))
+
+    def test_skip_foreign_sheet(self):
+        """A sheet without the expected columns is skipped, also with an explicit first data row."""
+        workbook = openpyxl.load_workbook(self.copy)
+        notes = workbook.create_sheet("Notizen")
+        notes.append(["Datum", "Notiz"])
+        notes.append(["2025-01-01", "Elternabend"])
+        workbook.save(self.copy)
+
+        expected = _summary(read_workbook(MAPPE1, KindergardenExcelSheetConfiguration))
+        self.assertEqual(len(expected), 6)
+        self.assertEqual(_summary(read_workbook(self.copy, KindergardenExcelSheetConfiguration)), expected)
+        # Excel rows are 1 based, the first data row is 0 based
+        self.assertEqual(_summary(read_workbook(self.copy, KindergardenExcelSheetConfiguration, 5)),
+                         [contact for contact in expected if contact[2] > 5])
+
+    def test_first_data_row_without_headline(self):
+        """An explicit first data row reads a sheet without the expected headline, which is skipped otherwise."""
+        workbook = openpyxl.load_workbook(self.copy)
+        workbook["Tabelle1"]["W3"] = "Nachname"
+        workbook.save(self.copy)
+
+        self.assertEqual(read_workbook(self.copy, KindergardenExcelSheetConfiguration), [])
+        self.assertEqual(_summary(read_workbook(self.copy, KindergardenExcelSheetConfiguration, 3)),
+                         _summary(read_workbook(MAPPE1, KindergardenExcelSheetConfiguration)))
+
+
+if __name__ == '__main__':
+    unittest.main()
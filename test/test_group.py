@@ -0,0 +1,113 @@
+"""This class tests the group handler against a mocked Microsoft Graph API."""
+
+import unittest
+from unittest import mock
+
+import group
+from group import GroupHandler, MAX_FILTER_CLAUSES
+from group_details import GroupDetails
+
+
+class _Response:  # pylint: disable=R0903
+    """Minimal stand in for requests.Response."""
+
+    def __init__(self, status_code: int, data=None):
+        self.status_code = status_code
+        self._data = data if data is not None else {}
+
+    def json(self):
+        """The parsed body."""
+        return self._data
+
+
+class TestGetGroupsByPrefixes(unittest.TestCase):
+    """Multi-prefix search with chunked filters, pagination and bucketing."""
+
+    def setUp(self):
+        self.calls = []
+        self.handler = GroupHandler("token")
+
+    def _get(self, url, headers, params, timeout):  # pylint: disable=W0613
+        self.calls.append((url, params))
+        if url == "next-page":
+            return _Response(200, {"value": [{"id": "2", "displayName": "p00 second page"}]})
+        if "startswith(displayName, 'P00')" in params["$filter"]:
+            return _Response(200, {"value": [{"id": "1", "displayName": "P00 Eltern"}], "@odata.nextLink": "next-page"})
+        # the second chunk with prefix 'P0' finds the same group again
+        return _Response(200, {"value": [{"id": "1", "displayName": "P00 Eltern"}]})
+
+    def test_chunks_pages_and_buckets(self):
+        """Prefixes are chunked, pages followed, groups deduplicated and bucketed case insensitively."""
+        prefixes = [f"P{i:02d}" for i in range(MAX_FILTER_CLAUSES)] + ["p0"]
+
+        with mock.patch.object(group.requests, "get", side_effect=self._get):
+            buckets = self.handler.get_groups_by_prefixes(prefixes)
+
+        first_requests = [params for url, params in self.calls if url == group.GROUPS_URL]
+        self.assertEqual(len(first_requests), 2)
+        self.assertEqual(sorted(params["$filter"].count("startswith") for params in first_requests), [1, MAX_FILTER_CLAUSES])
+        # the next link already carries the query, so no parameters are sent again
+        self.assertEqual([params for url, params in self.calls if url == "next-page"], [None])
+
+        self.assertEqual([found["id"] for found in buckets["P00"]], ["1", "2"])
+        self.assertEqual([found["id"] for found in buckets["p0"]], ["1", "2"])
+        self.assertEqual(buckets["P01"], [])
+
+    def test_quotes_are_escaped(self):
+        """Single quotes in prefixes are doubled for OData."""
+        with mock.patch.object(group.requests, "get", return_value=_Response(200, {"value": []})) as get:
+            self.handler.get_groups_by_prefixes(["O'Neil"])
+        self.assertEqual(get.call_args.kwargs["params"]["$filter"], "startswith(displayName, 'O''Neil')")
+
+    def test_empty_prefix_rejected(self):
+        """An empty prefix would match every group."""
+        with self.assertRaises(AssertionError):
+            self.handler.get_groups_by_prefixes(["Kita", ""])
+
+
+class TestCreateGroups(unittest.TestCase):
+    """Bulk creation with exact name lookup and readiness polling."""
+
+    def setUp(self):
+        self.handler = GroupHandler("token")
+        self.polls = 0
+        patcher = mock.patch.multiple(group, READINESS_INITIAL_DELAY=0.0, READINESS_MAX_DELAY=0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _get(self, url, headers, params, timeout):  # pylint: disable=W0613
+        if url.endswith("/members"):
+            if "forbidden" in url:
+                return _Response(403, {"error": "Authorization_RequestDenied"})
+            self.polls += 1
+            if self.polls == 1:
+                raise group.requests.Timeout("boom")
+            return _Response(404 if self.polls < 4 else 200)
+        if params["$filter"] == "displayName eq 'Eltern 2025 A'":
+            return _Response(200, {"value": [{"id": "existing", "displayName": "Eltern 2025 A"}]})
+        return _Response(200, {"value": []})
+
+    @staticmethod
+    def _post(url, headers, json, timeout):  # pylint: disable=W0613
+        group_id = "forbidden" if json["displayName"] == "Verboten" else f"new-{json['displayName']}"
+        return _Response(201, {"id": group_id, "displayName": json["displayName"]})
+
+    def test_exact_lookup(self):
+        """A group whose name only starts with the requested name is not taken."""
+        with mock.patch.object(group.requests, "get", side_effect=self._get), \
+                mock.patch.object(group.requests, "post", side_effect=self._post) as post:
+            self.assertEqual(self.handler.get_or_create(GroupDetails("Eltern 2025 A", "a"))["id"], "existing")
+            self.assertEqual(self.handler.get_or_create(GroupDetails("Eltern 2025", "e"))["id"], "new-Eltern 2025")
+        self.assertEqual(post.call_count, 1)
+
+    def test_poll_errors_do_not_abort(self):
+        """A request error while polling is retried, a forbidden group is dropped without waiting for the timeout."""
+        with mock.patch.object(group.requests, "get", side_effect=self._get), \
+                mock.patch.object(group.requests, "post", side_effect=self._post):
+            ready = self.handler.create_groups([GroupDetails("Eltern 2025", "e"), GroupDetails("Verboten", "v")])
+        self.assertEqual(ready, {"Eltern 2025": "new-Eltern 2025"})
+        self.assertEqual(self.polls, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -26,8 +26,8 @@ token = authenticate(env)
 
 group_handler = GroupHandler(token)
 
-for group_prefix in prefixes_list:
-    print(f"Reading group names for prefix {group_prefix}")
-    groups = group_handler.get_groups(group_prefix)
+groups_by_prefix = group_handler.get_groups_by_prefixes(prefixes_list)
+for group_prefix, groups in groups_by_prefix.items():
+    print(f"Group names for prefix {group_prefix}")
     if groups:
         print(f"{json.dumps(groups, indent=2)}\n---")
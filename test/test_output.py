@@ -0,0 +1,91 @@
+"""This class tests the central output of messages and command results."""
+
+import io
+import json
+import logging
+import unittest
+from unittest import mock
+
+import output
+
+
+class _Expensive:  # pylint: disable=R0903
+    """Data which records whether it was serialized."""
+
+    def __init__(self):
+        self.serialized = False
+
+    def __str__(self):
+        self.serialized = True
+        return "expensive"
+
+
+class TestOutput(unittest.TestCase):
+    """Verbosity levels, lazy data serialization and result formats."""
+
+    def setUp(self):
+        # cleanups run in reverse order, the default output is restored on the real stderr
+        self.addCleanup(output.configure)
+        self.stderr = io.StringIO()
+        self.stdout = io.StringIO()
+        patcher = mock.patch.multiple("sys", stderr=self.stderr, stdout=self.stdout)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.logger = output.get_logger("test")
+
+    def test_level_mapping(self):
+        """Quiet shows warnings, normal adds info and verbose adds debug."""
+        for verbosity, level in ((output.QUIET, logging.WARNING), (output.NORMAL, logging.INFO), (output.VERBOSE, logging.DEBUG)):
+            with self.subTest(verbosity=verbosity):
+                output.configure(verbosity)
+                self.assertEqual(logging.getLogger(output.LOGGER_NAME).getEffectiveLevel(), level)
+
+    def test_lazy_data(self):
+        """Data below the configured level is never serialized."""
+        output.configure(output.NORMAL)
+        data = _Expensive()
+        output.log_data(self.logger, logging.DEBUG, "hidden", data)
+        self.assertFalse(data.serialized)
+        self.assertEqual(self.stderr.getvalue(), "")
+
+        output.log_data(self.logger, logging.INFO, "shown", data)
+        self.assertTrue(data.serialized)
+        self.assertEqual(self.stderr.getvalue(), 'shown\n"expensive"\n')
+
+    def test_exception_in_json(self):
+        """Tracebacks are kept in structured messages."""
+        output.configure(output.NORMAL, structured=True)
+        try:
+            raise ValueError("broken")
+        except ValueError:
+            self.logger.exception("failed")
+        entry = json.loads(self.stderr.getvalue())
+        self.assertEqual(entry["message"], "failed")
+        self.assertIn("ValueError: broken", entry["exc"])
+
+    def test_exception_in_text(self):
+        """Tracebacks are kept in human readable messages."""
+        output.configure(output.NORMAL)
+        try:
+            raise ValueError("broken")
+        except ValueError:
+            self.logger.exception("failed")
+        self.assertTrue(self.stderr.getvalue().startswith("failed\nTraceback"))
+
+    def test_emit_result(self):
+        """Results are text by default and one JSON object per line in structured mode."""
+        output.configure(output.NORMAL)
+        output.emit_result({"id": "1"}, "text result")
+        output.emit_result({"id": "2"})
+        self.assertEqual(self.stdout.getvalue(), 'text result\n{\n  "id": "2"\n}\n')
+
+        self.stdout.seek(0)
+        self.stdout.truncate()
+        output.configure(output.NORMAL, structured=True)
+        output.emit_result({"id": "1"}, "text result")
+        output.emit_result({"id": "2"})
+        self.assertEqual([json.loads(line) for line in self.stdout.getvalue().splitlines()], [{"id": "1"}, {"id": "2"}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+"""This class tests reading and writing users files as JSON array and NDJSON."""
+
+import io
+import json
+import unittest
+
+from user_details import UserDetails
+from user_file import is_ndjson, iter_users, write_user, write_users
+
+
+def _named_stream(name: str, content: str = "") -> io.StringIO:
+    stream = io.StringIO(content)
+    stream.name = name  # type: ignore[misc]
+    return stream
+
+
+CONTACTS = [UserDetails("Anna", "Muster", "anna@example.org"), UserDetails("Bert", "Beispiel", "bert@example.org")]
+
+
+class TestUserFile(unittest.TestCase):
+    """Round trip of user details through the supported file formats."""
+
+    def assert_contacts(self, contacts):
+        """Compare the read contacts with the written ones."""
+        self.assertEqual([contact.to_dict() for contact in contacts], [contact.to_dict() for contact in CONTACTS])
+
+    def test_format_detection(self):
+        """The format is selected by the file name. Standard streams are always NDJSON."""
+        self.assertTrue(is_ndjson("users.ndjson"))
+        self.assertTrue(is_ndjson("USERS.JSONL"))
+        self.assertTrue(is_ndjson("-"))
+        self.assertTrue(is_ndjson("<stdin>"))
+        self.assertTrue(is_ndjson("<stdout>"))
+        self.assertFalse(is_ndjson("users.json"))
+
+    def test_json_array(self):
+        """A .json file is written as one indented array."""
+        output = _named_stream("users.json")
+        write_users(output, CONTACTS)
+        self.assertIsInstance(json.loads(output.getvalue()), list)
+        self.assert_contacts(list(iter_users(_named_stream("users.json", output.getvalue()))))
+
+    def test_ndjson(self):
+        """A .ndjson file has one contact per line."""
+        output = _named_stream("users.ndjson")
+        write_users(output, CONTACTS)
+        self.assertEqual(len(output.getvalue().splitlines()), len(CONTACTS))
+        self.assert_contacts(list(iter_users(_named_stream("users.ndjson", output.getvalue()))))
+
+    def test_stream_with_blank_lines(self):
+        """Contacts written one by one to stdout are read back from stdin, ignoring blank lines."""
+        output = _named_stream("<stdout>")
+        for contact in CONTACTS:
+            write_user(output, contact)
+        content = "\n" + output.getvalue().replace("\n", "\n  \n")
+        self.assert_contacts(list(iter_users(_named_stream("<stdin>", content))))
+
+
+if __name__ == '__main__':
+    unittest.main()